@@ -10,6 +10,7 @@ class AIAnalyzer:
     
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY", "")
+        self._client = None
         if not self.api_key:
             print("Warning: OPENAI_API_KEY not set. Using mock responses.")
     
@@ -20,10 +21,12 @@ class AIAnalyzer:
             return self._mock_ai_response(prompt)
         
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
+            # The SDK is imported and the client built on first use only
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(api_key=self.api_key)
             
-            response = client.chat.completions.create(
+            response = self._client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": "You are an expert educational analyst."},
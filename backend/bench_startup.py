@@ -0,0 +1,77 @@
+"""Benchmark cold-start time of an API worker
+
+Spawns a fresh uvicorn process and measures the time from process start until
+the first request to `/` succeeds (time-to-first-request), plus the bare
+`import main` time in a fresh interpreter.
+
+Usage:
+    python bench_startup.py [--runs 5] [--timeout 30]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_import() -> float:
+    """Seconds to `import main` in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def measure_first_request(timeout: float) -> float:
+    """Seconds from spawning a cold uvicorn worker to its first 200 response"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving a request")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No response from {url} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def _report(name: str, samples):
+    print(f"{name}: median {statistics.median(samples) * 1000:.1f} ms, "
+          f"min {min(samples) * 1000:.1f} ms, max {max(samples) * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    import_times = [measure_import() for _ in range(args.runs)]
+    first_request_times = [measure_first_request(args.timeout) for _ in range(args.runs)]
+
+    print(f"Startup benchmark ({args.runs} runs)")
+    _report("import main", import_times)
+    _report("time to first request", first_request_times)
+
+if __name__ == "__main__":
+    main()
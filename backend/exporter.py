@@ -0,0 +1,140 @@
+import csv
+import io
+from typing import Iterator, List
+
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import User, Topic, Syllabus, StudentTopicScore
+
+EXPORT_COLUMNS = [
+    "student_id", "username", "topic_id", "topic_name",
+    "syllabus_version", "score", "answer_sheet_id", "created_at"
+]
+
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _escape_formula(value):
+    """Neutralize spreadsheet formulas in user-controlled text (CSV injection)"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class ScoreExporter:
+    """Streams student topic scores for a course as CSV or Parquet"""
+
+    def __init__(self, batch_size: int = 10000):
+        self.batch_size = batch_size
+
+    def _query(self, course_id: int):
+        return (
+            select(
+                StudentTopicScore.student_id,
+                User.username,
+                StudentTopicScore.topic_id,
+                Topic.name,
+                Syllabus.version,
+                StudentTopicScore.score,
+                StudentTopicScore.answer_sheet_id,
+                StudentTopicScore.created_at,
+            )
+            .join(User, User.id == StudentTopicScore.student_id)
+            .join(Topic, Topic.id == StudentTopicScore.topic_id)
+            .join(Syllabus, Syllabus.id == Topic.syllabus_id)
+            .where(StudentTopicScore.course_id == course_id)
+            .order_by(StudentTopicScore.id)
+        )
+
+    def _iter_batches(self, course_id: int) -> Iterator[list]:
+        """
+        Yield lists of plain row tuples from a server-side cursor.
+        Uses its own session so it outlives the request's dependency scope.
+        """
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                self._query(course_id).execution_options(yield_per=self.batch_size)
+            )
+            for partition in result.partitions():
+                yield partition
+        finally:
+            db.close()
+
+    def iter_csv(self, course_id: int) -> Iterator[str]:
+        """Yield CSV text one batch at a time, header first"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+
+        for rows in self._iter_batches(course_id):
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                row = [_escape_formula(value) for value in row]
+                if row[-1] is not None:
+                    row[-1] = row[-1].isoformat()
+                writer.writerow(row)
+            yield buffer.getvalue()
+
+    def iter_parquet(self, course_id: int) -> Iterator[bytes]:
+        """Yield a Parquet file with one row group per batch"""
+        # Optional dependency, only needed for Parquet exports
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("student_id", pa.int64()),
+            ("username", pa.string()),
+            ("topic_id", pa.int64()),
+            ("topic_name", pa.string()),
+            ("syllabus_version", pa.int32()),
+            ("score", pa.float64()),
+            ("answer_sheet_id", pa.int64()),
+            ("created_at", pa.timestamp("us")),
+        ])
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            for rows in self._iter_batches(course_id):
+                columns = list(zip(*rows))
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                    schema=schema
+                )
+                writer.write_batch(batch, row_group_size=len(rows))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
@@ -1,10 +1,169 @@
-"""Initialize database with demo accounts"""
+"""Initialize database schema and demo accounts
+
+Usage:
+    python init_db.py               # create/upgrade tables and demo accounts
+    python init_db.py --schema-only # create/upgrade tables only (deploy step)
+"""
+import sys
+
+from sqlalchemy import inspect, text
+
 from database import SessionLocal, engine, Base
-from models import User
+from models import User, Course, Enrollment
 from auth import get_password_hash
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Columns added when syllabi, topics and scores became scoped per course
+COURSE_COLUMNS = {
+    "syllabus": [
+        ("course_id", "INTEGER REFERENCES courses(id)"),
+        ("version", "INTEGER"),
+        ("is_current", "BOOLEAN"),
+    ],
+    "topics": [("course_id", "INTEGER REFERENCES courses(id)")],
+    "answer_sheets": [("course_id", "INTEGER REFERENCES courses(id)")],
+    "student_topic_scores": [("course_id", "INTEGER REFERENCES courses(id)")],
+}
+
+def create_tables():
+    """Create any missing tables. Run once per deploy, not on API startup."""
+    Base.metadata.create_all(bind=engine)
+    print("Database tables created.")
+
+def upgrade_schema():
+    """
+    Upgrade a database created before courses existed. Safe to run repeatedly.
+    Adds the course columns and indexes, creates a "Default class" per teacher,
+    backfills course_id from the existing data and enrolls existing students.
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        legacy = False
+        
+        for table, columns in COURSE_COLUMNS.items():
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for name, ddl in columns:
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    legacy = True
+        
+        # Every teacher gets a default course to own their existing syllabi
+        conn.execute(text("""
+            INSERT INTO courses (name, teacher_id, created_at)
+            SELECT 'Default class', users.id, CURRENT_TIMESTAMP FROM users
+            WHERE users.role = 'teacher'
+              AND NOT EXISTS (SELECT 1 FROM courses WHERE courses.teacher_id = users.id)
+        """))
+        
+        # Syllabi go to their uploader's first course, or the first course overall
+        conn.execute(text("""
+            UPDATE syllabus SET course_id = (
+                SELECT MIN(courses.id) FROM courses WHERE courses.teacher_id = syllabus.uploaded_by
+            ) WHERE course_id IS NULL
+        """))
+        conn.execute(text("""
+            UPDATE syllabus SET course_id = (SELECT MIN(id) FROM courses)
+            WHERE course_id IS NULL
+        """))
+        
+        # Number legacy syllabi per course and make the newest one current
+        rows = conn.execute(text(
+            "SELECT id, course_id FROM syllabus WHERE version IS NULL ORDER BY id"
+        )).fetchall()
+        for syllabus_id, course_id in rows:
+            latest = conn.execute(
+                text("SELECT MAX(version) FROM syllabus WHERE course_id = :course_id"),
+                {"course_id": course_id}
+            ).scalar() or 0
+            conn.execute(
+                text("UPDATE syllabus SET version = :version, is_current = :is_current WHERE id = :id"),
+                {"version": latest + 1, "is_current": False, "id": syllabus_id}
+            )
+        for (course_id,) in conn.execute(text("SELECT DISTINCT course_id FROM syllabus")).fetchall():
+            has_current = conn.execute(
+                text("SELECT 1 FROM syllabus WHERE course_id = :course_id AND is_current = :t"),
+                {"course_id": course_id, "t": True}
+            ).first()
+            if not has_current:
+                conn.execute(
+                    text("""
+                        UPDATE syllabus SET is_current = :t WHERE id = (
+                            SELECT MAX(id) FROM syllabus WHERE course_id = :course_id
+                        )
+                    """),
+                    {"course_id": course_id, "t": True}
+                )
+        
+        conn.execute(text("""
+            UPDATE topics SET course_id = (
+                SELECT syllabus.course_id FROM syllabus WHERE syllabus.id = topics.syllabus_id
+            ) WHERE course_id IS NULL
+        """))
+        conn.execute(text("""
+            UPDATE student_topic_scores SET course_id = (
+                SELECT topics.course_id FROM topics WHERE topics.id = student_topic_scores.topic_id
+            ) WHERE course_id IS NULL
+        """))
+        conn.execute(text("""
+            UPDATE answer_sheets SET course_id = (
+                SELECT MIN(s.course_id) FROM student_topic_scores s
+                WHERE s.answer_sheet_id = answer_sheets.id
+            ) WHERE course_id IS NULL
+        """))
+        
+        # Students keep access to the courses they already have scores in
+        conn.execute(text("""
+            INSERT INTO enrollments (course_id, student_id, created_at)
+            SELECT DISTINCT s.course_id, s.student_id, CURRENT_TIMESTAMP
+            FROM student_topic_scores s
+            WHERE s.course_id IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM enrollments e
+                  WHERE e.course_id = s.course_id AND e.student_id = s.student_id
+              )
+        """))
+        if legacy:
+            # Before courses, every student could submit to the single syllabus
+            conn.execute(text("""
+                INSERT INTO enrollments (course_id, student_id, created_at)
+                SELECT (SELECT MIN(course_id) FROM syllabus WHERE is_current = :t),
+                       users.id, CURRENT_TIMESTAMP
+                FROM users
+                WHERE users.role = 'student'
+                  AND EXISTS (SELECT 1 FROM syllabus WHERE is_current = :t)
+                  AND NOT EXISTS (SELECT 1 FROM enrollments e WHERE e.student_id = users.id)
+            """), {"t": True})
+        
+        conn.execute(text("""
+            UPDATE answer_sheets SET course_id = (
+                SELECT MAX(e.course_id) FROM enrollments e
+                WHERE e.student_id = answer_sheets.student_id
+            ) WHERE course_id IS NULL
+        """))
+        
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        inspector = inspect(conn)
+        unique_names = {u["name"] for u in inspector.get_unique_constraints("syllabus")}
+        index_names = {i["name"] for i in inspector.get_indexes("syllabus")}
+        if "uq_syllabus_course_version" not in unique_names | index_names:
+            # Existing tables can't gain constraints on SQLite; a unique index is equivalent
+            conn.execute(text(
+                "CREATE UNIQUE INDEX uq_syllabus_course_version ON syllabus (course_id, version)"
+            ))
+        
+        # SQLite can't alter column nullability; elsewhere enforce it once backfilled
+        if engine.dialect.name != "sqlite":
+            for table in COURSE_COLUMNS:
+                remaining = conn.execute(
+                    text(f"SELECT COUNT(*) FROM {table} WHERE course_id IS NULL")
+                ).scalar()
+                if remaining:
+                    print(f"Warning: {remaining} rows in {table} have no course; leaving course_id nullable")
+                else:
+                    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN course_id SET NOT NULL"))
+    
+    print("Database schema is up to date.")
 
 def init_demo_accounts():
     db = SessionLocal()
@@ -22,6 +181,12 @@ def init_demo_accounts():
             role="teacher"
         )
         db.add(teacher)
+        db.flush()
+        
+        # Create the teacher's default class
+        course = Course(name="Default class", teacher_id=teacher.id)
+        db.add(course)
+        db.flush()
         
         # Create student accounts
         students = [
@@ -37,6 +202,8 @@ def init_demo_accounts():
                 role="student"
             )
             db.add(student)
+            db.flush()
+            db.add(Enrollment(course_id=course.id, student_id=student.id))
         
         db.commit()
         print("Demo accounts created successfully!")
@@ -51,5 +218,8 @@ def init_demo_accounts():
         db.close()
 
 if __name__ == "__main__":
-    init_demo_accounts()
+    create_tables()
+    upgrade_schema()
+    if "--schema-only" not in sys.argv[1:]:
+        init_demo_accounts()
 
@@ -1,25 +1,28 @@
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
 from datetime import datetime, timedelta
 import uuid
 
-from database import SessionLocal, engine, Base
-from models import User, LoginCode, Syllabus, AnswerSheet, Topic, StudentTopicScore
+from database import SessionLocal
+from models import User, LoginCode, Course, Enrollment, Syllabus, AnswerSheet, Topic, StudentTopicScore
 from schemas import (
     UserLogin, UserResponse, CodeResponse, 
-    SyllabusUpload, AnswerUpload, AnalyticsResponse
+    SyllabusUpload, AnswerUpload, AnalyticsResponse,
+    CourseCreate, CourseResponse, EnrollmentCreate, EnrollmentResponse
 )
 from auth import verify_password, get_password_hash, create_access_token, verify_token
 from pdf_processor import PDFProcessor
 from ai_analyzer import AIAnalyzer
+from exporter import ScoreExporter
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
+# Tables are created by `python init_db.py`, not on import, to keep worker boot fast
 app = FastAPI(title="Student Performance Analyzer")
 
 # CORS middleware
@@ -56,9 +59,55 @@ def get_current_user(
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
+def get_teacher_course(
+    db: Session,
+    teacher: User,
+    course_id: Optional[int],
+    create_default: bool = False
+) -> Optional[Course]:
+    """
+    Resolve a course owned by the teacher, defaulting to their first course.
+    A "Default class" is only created when create_default is set (write paths);
+    otherwise None is returned if the teacher has no course yet.
+    """
+    if course_id is not None:
+        course = db.query(Course).filter(
+            Course.id == course_id,
+            Course.teacher_id == teacher.id
+        ).first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return course
+    
+    course = db.query(Course).filter(Course.teacher_id == teacher.id).order_by(Course.id).first()
+    if not course and create_default:
+        course = Course(name="Default class", teacher_id=teacher.id)
+        db.add(course)
+        db.commit()
+        db.refresh(course)
+    return course
+
+def get_student_course(db: Session, student: User, course_id: Optional[int]) -> Course:
+    """Resolve a course the student is enrolled in, defaulting to their latest enrollment"""
+    query = db.query(Enrollment).filter(Enrollment.student_id == student.id)
+    if course_id is not None:
+        query = query.filter(Enrollment.course_id == course_id)
+    
+    enrollment = query.order_by(Enrollment.id.desc()).first()
+    if not enrollment:
+        raise HTTPException(status_code=403, detail="You are not enrolled in this course")
+    return enrollment.course
+
+def get_current_syllabus(db: Session, course_id: int) -> Optional[Syllabus]:
+    return db.query(Syllabus).filter(
+        Syllabus.course_id == course_id,
+        Syllabus.is_current == True
+    ).first()
+
 # Initialize processors
 pdf_processor = PDFProcessor()
 ai_analyzer = AIAnalyzer()
+score_exporter = ScoreExporter()
 
 @app.get("/")
 def root():
@@ -139,16 +188,88 @@ def get_current_code(current_user: User = Depends(get_current_user), db: Session
         return {"code": code_obj.code, "expires_at": code_obj.expires_at.isoformat()}
     return None
 
+@app.post("/api/teacher/courses", response_model=CourseResponse)
+def create_course(
+    course_data: CourseCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a new class/course owned by the teacher"""
+    if current_user.role != "teacher":
+        raise HTTPException(status_code=403, detail="Only teachers can create courses")
+    
+    course = Course(name=course_data.name, teacher_id=current_user.id)
+    db.add(course)
+    db.commit()
+    db.refresh(course)
+    
+    return {"id": course.id, "name": course.name, "created_at": course.created_at.isoformat()}
+
+@app.get("/api/teacher/courses", response_model=List[CourseResponse])
+def list_courses(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """List the teacher's courses"""
+    if current_user.role != "teacher":
+        raise HTTPException(status_code=403, detail="Only teachers can view courses")
+    
+    courses = db.query(Course).filter(Course.teacher_id == current_user.id).order_by(Course.id).all()
+    return [
+        {"id": c.id, "name": c.name, "created_at": c.created_at.isoformat()}
+        for c in courses
+    ]
+
+@app.post("/api/teacher/courses/{course_id}/enrollments", response_model=EnrollmentResponse)
+def enroll_students(
+    course_id: int,
+    enrollment_data: EnrollmentCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Enroll students in one of the teacher's courses by username"""
+    if current_user.role != "teacher":
+        raise HTTPException(status_code=403, detail="Only teachers can enroll students")
+    
+    course = get_teacher_course(db, current_user, course_id)
+    
+    students = db.query(User).filter(
+        User.username.in_(enrollment_data.usernames),
+        User.role == "student"
+    ).all()
+    found = {s.username for s in students}
+    missing = [u for u in enrollment_data.usernames if u not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Students not found: {', '.join(missing)}")
+    
+    already_enrolled = {
+        student_id for (student_id,) in db.query(Enrollment.student_id).filter(
+            Enrollment.course_id == course.id,
+            Enrollment.student_id.in_([s.id for s in students])
+        )
+    }
+    for student in students:
+        if student.id not in already_enrolled:
+            try:
+                # Savepoint per student so a concurrent enrollment only skips that row
+                with db.begin_nested():
+                    db.add(Enrollment(course_id=course.id, student_id=student.id))
+            except IntegrityError:
+                pass  # Enrolled by a concurrent request
+    db.commit()
+    
+    return {"course_id": course.id, "usernames": sorted(found)}
+
 @app.post("/api/teacher/upload-syllabus")
 def upload_syllabus(
     file: UploadFile = File(...),
+    course_id: Optional[int] = Form(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Upload syllabus PDF and extract topics"""
+    """Upload syllabus PDF and extract topics as a new version for the course"""
     if current_user.role != "teacher":
         raise HTTPException(status_code=403, detail="Only teachers can upload syllabus")
     
+    course = get_teacher_course(db, current_user, course_id, create_default=True)
+    
     # Save file temporarily
     os.makedirs("uploads", exist_ok=True)
     file_path = f"uploads/syllabus_{datetime.utcnow().timestamp()}.pdf"
@@ -164,33 +285,56 @@ def upload_syllabus(
         # Extract topics using AI
         topics = ai_analyzer.extract_topics_from_syllabus(text)
         
-        # Clear old syllabus and topics
-        db.query(Topic).delete()
-        db.query(Syllabus).delete()
+        # Lock the course row so concurrent uploads don't pick the same version
+        db.query(Course).filter(Course.id == course.id).with_for_update().one()
+        
+        # Retire the course's current syllabus; old topics and scores are kept
+        latest_version = db.query(func.max(Syllabus.version)).filter(
+            Syllabus.course_id == course.id
+        ).scalar() or 0
+        db.query(Syllabus).filter(
+            Syllabus.course_id == course.id,
+            Syllabus.is_current == True
+        ).update({"is_current": False})
         
         # Save syllabus
         syllabus = Syllabus(
+            course_id=course.id,
+            version=latest_version + 1,
+            is_current=True,
             filename=file.filename,
             content=text,
             uploaded_by=current_user.id
         )
         db.add(syllabus)
-        db.commit()
-        db.refresh(syllabus)
+        db.flush()
         
         # Save topics
         for topic_name in topics:
-            topic = Topic(name=topic_name, syllabus_id=syllabus.id)
+            topic = Topic(name=topic_name, course_id=course.id, syllabus_id=syllabus.id)
             db.add(topic)
         
+        # Single commit so the version switch and its topics become visible together
         db.commit()
         
         # Clean up file
         os.remove(file_path)
         
-        return {"message": "Syllabus uploaded successfully", "topics": topics}
+        return {
+            "message": "Syllabus uploaded successfully",
+            "course_id": course.id,
+            "version": syllabus.version,
+            "topics": topics
+        }
     
+    except IntegrityError:
+        # Databases without row locks (SQLite) can still race on the version number
+        db.rollback()
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise HTTPException(status_code=409, detail="Another syllabus upload for this course is in progress, please retry")
     except Exception as e:
+        db.rollback()
         if os.path.exists(file_path):
             os.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Error processing syllabus: {str(e)}")
@@ -198,6 +342,7 @@ def upload_syllabus(
 @app.post("/api/student/upload-answer")
 def upload_answer(
     file: UploadFile = File(...),
+    course_id: Optional[int] = Form(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -205,8 +350,10 @@ def upload_answer(
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can upload answers")
     
+    course = get_student_course(db, current_user, course_id)
+    
     # Check if syllabus exists
-    syllabus = db.query(Syllabus).first()
+    syllabus = get_current_syllabus(db, course.id)
     if not syllabus:
         raise HTTPException(status_code=400, detail="No syllabus uploaded yet")
     
@@ -222,15 +369,20 @@ def upload_answer(
         # Convert PDF to text
         text = pdf_processor.pdf_to_text(file_path)
         
-        # Get topics
-        topics = db.query(Topic).all()
-        topic_names = [t.name for t in topics]
+        # Get topics of the course's current syllabus
+        topics = db.query(Topic).filter(
+            Topic.course_id == course.id,
+            Topic.syllabus_id == syllabus.id
+        ).all()
+        topics_by_name = {t.name: t for t in topics}
+        topic_names = list(topics_by_name)
         
         # Analyze answer using AI
         topic_scores = ai_analyzer.analyze_answer_sheet(text, topic_names)
         
         # Save answer sheet
         answer_sheet = AnswerSheet(
+            course_id=course.id,
             filename=file.filename,
             content=text,
             student_id=current_user.id
@@ -239,17 +391,19 @@ def upload_answer(
         db.commit()
         db.refresh(answer_sheet)
         
+        # Delete old scores for this syllabus' topics
+        db.query(StudentTopicScore).filter(
+            StudentTopicScore.course_id == course.id,
+            StudentTopicScore.student_id == current_user.id,
+            StudentTopicScore.topic_id.in_([t.id for t in topics])
+        ).delete(synchronize_session=False)
+        
         # Save topic scores
         for topic_name, score in topic_scores.items():
-            topic = db.query(Topic).filter(Topic.name == topic_name).first()
+            topic = topics_by_name.get(topic_name)
             if topic:
-                # Delete old score if exists
-                db.query(StudentTopicScore).filter(
-                    StudentTopicScore.student_id == current_user.id,
-                    StudentTopicScore.topic_id == topic.id
-                ).delete()
-                
                 score_obj = StudentTopicScore(
+                    course_id=course.id,
                     student_id=current_user.id,
                     topic_id=topic.id,
                     answer_sheet_id=answer_sheet.id,
@@ -265,50 +419,101 @@ def upload_answer(
         return {"message": "Answer sheet uploaded and analyzed successfully"}
     
     except Exception as e:
+        db.rollback()
         if os.path.exists(file_path):
             os.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Error processing answer sheet: {str(e)}")
 
 @app.get("/api/teacher/analytics", response_model=AnalyticsResponse)
-def get_analytics(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_analytics(
+    course_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get analytics for teacher dashboard - returns average scores per topic"""
     if current_user.role != "teacher":
         raise HTTPException(status_code=403, detail="Only teachers can view analytics")
     
-    # Get all topics
-    topics = db.query(Topic).all()
-    
-    # Get all students
-    students = db.query(User).filter(User.role == "student").all()
-    
-    # Calculate average scores per topic
-    topic_averages = []
-    
-    for topic in topics:
-        # Get all scores for this topic from all students
-        scores = []
-        for student in students:
-            score_obj = db.query(StudentTopicScore).filter(
-                StudentTopicScore.student_id == student.id,
-                StudentTopicScore.topic_id == topic.id
-            ).order_by(StudentTopicScore.id.desc()).first()
-            
-            if score_obj:
-                scores.append(score_obj.score)
-        
-        # Calculate average
-        if scores:
-            average_score = sum(scores) / len(scores)
-        else:
-            average_score = 0.0
-        
-        topic_averages.append({
+    course = get_teacher_course(db, current_user, course_id)
+    if not course:
+        return {"course_id": None, "topic_averages": []}
+    
+    syllabus = get_current_syllabus(db, course.id)
+    if not syllabus:
+        return {"course_id": course.id, "topic_averages": []}
+    
+    # Get topics of the current syllabus
+    topics = db.query(Topic).filter(
+        Topic.course_id == course.id,
+        Topic.syllabus_id == syllabus.id
+    ).order_by(Topic.id).all()
+    
+    # Average scores per topic within this course only
+    averages = dict(
+        db.query(StudentTopicScore.topic_id, func.avg(StudentTopicScore.score))
+        .filter(
+            StudentTopicScore.course_id == course.id,
+            StudentTopicScore.topic_id.in_([t.id for t in topics])
+        )
+        .group_by(StudentTopicScore.topic_id)
+        .all()
+    )
+    
+    topic_averages = [
+        {
             "topic_id": topic.id,
             "topic_name": topic.name,
-            "average_score": round(average_score, 2)
-        })
+            "average_score": round(averages.get(topic.id) or 0.0, 2)
+        }
+        for topic in topics
+    ]
+    
+    return {"course_id": course.id, "topic_averages": topic_averages}
+
+@app.get("/api/teacher/export/scores.csv")
+def export_scores_csv(
+    course_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream all student topic scores for a course as CSV"""
+    if current_user.role != "teacher":
+        raise HTTPException(status_code=403, detail="Only teachers can export scores")
     
-    return {"topic_averages": topic_averages}
+    course = get_teacher_course(db, current_user, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    return StreamingResponse(
+        score_exporter.iter_csv(course.id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="scores_course_{course.id}.csv"'}
+    )
+
+@app.get("/api/teacher/export/scores.parquet")
+def export_scores_parquet(
+    course_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream all student topic scores for a course as Parquet"""
+    if current_user.role != "teacher":
+        raise HTTPException(status_code=403, detail="Only teachers can export scores")
+    
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+    
+    course = get_teacher_course(db, current_user, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    return StreamingResponse(
+        score_exporter.iter_parquet(course.id),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="scores_course_{course.id}.parquet"'}
+    )
 
 if __name__ == "__main__":
     import uvicorn
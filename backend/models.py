@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -22,22 +22,61 @@ class LoginCode(Base):
     expires_at = Column(DateTime)
     is_active = Column(Boolean, default=True)
 
+class Course(Base):
+    __tablename__ = "courses"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
+    teacher_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    syllabi = relationship("Syllabus", back_populates="course")
+    enrollments = relationship("Enrollment", back_populates="course")
+
+class Enrollment(Base):
+    __tablename__ = "enrollments"
+    __table_args__ = (
+        UniqueConstraint("course_id", "student_id", name="uq_enrollment_course_student"),
+        Index("ix_enrollments_student_course", "student_id", "course_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    course = relationship("Course", back_populates="enrollments")
+
 class Syllabus(Base):
     __tablename__ = "syllabus"
+    __table_args__ = (
+        # Lookup of a course's current syllabus
+        Index("ix_syllabus_course_current", "course_id", "is_current"),
+        UniqueConstraint("course_id", "version", name="uq_syllabus_course_version"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    is_current = Column(Boolean, default=True)
     filename = Column(String)
     content = Column(Text)
     uploaded_by = Column(Integer, ForeignKey("users.id"))
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     
+    course = relationship("Course", back_populates="syllabi")
     topics = relationship("Topic", back_populates="syllabus")
 
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        Index("ix_topics_course_syllabus", "course_id", "syllabus_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
+    # Denormalized from the syllabus so per-course queries don't need a join
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     syllabus_id = Column(Integer, ForeignKey("syllabus.id"))
     
     syllabus = relationship("Syllabus", back_populates="topics")
@@ -47,6 +86,7 @@ class AnswerSheet(Base):
     __tablename__ = "answer_sheets"
     
     id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     filename = Column(String)
     content = Column(Text)
     student_id = Column(Integer, ForeignKey("users.id"))
@@ -56,8 +96,14 @@ class AnswerSheet(Base):
 
 class StudentTopicScore(Base):
     __tablename__ = "student_topic_scores"
+    __table_args__ = (
+        # Per-course analytics scan only this course's rows
+        Index("ix_scores_course_topic_student", "course_id", "topic_id", "student_id"),
+        Index("ix_scores_student_topic", "student_id", "topic_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     student_id = Column(Integer, ForeignKey("users.id"))
     topic_id = Column(Integer, ForeignKey("topics.id"))
     answer_sheet_id = Column(Integer, ForeignKey("answer_sheets.id"))
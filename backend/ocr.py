@@ -0,0 +1,230 @@
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional, TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import PyPDF2
+
+load_dotenv()
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Return the process-wide OCR pool, creating it on first use.
+    Workers are started with forkserver (spawn where unavailable) because
+    forking a threaded API worker can deadlock the child.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(method)
+            )
+            atexit.register(_shutdown_executor)
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a broken pool (e.g. a worker was OOM-killed) so the next caller gets a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def _render_and_ocr(page_pdf: bytes, dpi: int, lang: str, timeout: int) -> str:
+    """
+    Render a single-page PDF to an image and OCR it.
+    Runs in a worker process, so only one page is held in memory per worker.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "page.pdf")
+        image_prefix = os.path.join(tmp_dir, "page")
+
+        with open(pdf_path, "wb") as f:
+            f.write(page_pdf)
+
+        subprocess.run(
+            ["pdftoppm", "-r", str(dpi), "-png", "-singlefile", pdf_path, image_prefix],
+            check=True, capture_output=True, timeout=timeout
+        )
+        result = subprocess.run(
+            ["tesseract", image_prefix + ".png", "stdout", "-l", lang],
+            check=True, capture_output=True, timeout=timeout
+        )
+        return result.stdout.decode("utf-8", errors="replace")
+
+
+class OCRProcessor:
+    """OCR for PDF pages without a text layer using local Tesseract"""
+
+    def __init__(self):
+        self.dpi = int(os.getenv("OCR_DPI", "300"))
+        self.lang = os.getenv("OCR_LANG", "eng")
+        self.timeout = int(os.getenv("OCR_TIMEOUT", "120"))
+        self.max_workers = int(os.getenv("OCR_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.cache_dir = os.getenv("OCR_CACHE_DIR", "ocr_cache")
+        self.cache_max_age = float(os.getenv("OCR_CACHE_MAX_AGE_DAYS", "30")) * 86400
+        self._last_prune = 0.0
+        self.available = bool(shutil.which("tesseract") and shutil.which("pdftoppm"))
+        if not self.available:
+            print("Warning: tesseract/pdftoppm not found. OCR for scanned PDFs is disabled.")
+
+    def _page_bytes(self, reader: "PyPDF2.PdfReader", index: int) -> bytes:
+        """Serialize a single page as a standalone PDF"""
+        import PyPDF2
+
+        writer = PyPDF2.PdfWriter()
+        writer.add_page(reader.pages[index])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    def _cache_key(self, page_pdf: bytes) -> str:
+        # OCR settings are part of the key so changing them invalidates the cache
+        digest = hashlib.sha256(page_pdf)
+        digest.update(f"|{self.dpi}|{self.lang}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    def _read_cache(self, key: str) -> Optional[str]:
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        # Refresh the mtime so pruning evicts by last use, not first write
+        os.utime(path)
+        return text
+
+    def _write_cache(self, key: str, text: str):
+        path = self._cache_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so concurrent readers never see partial output
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def prune_cache(self):
+        """Remove cached OCR output not used within OCR_CACHE_MAX_AGE_DAYS"""
+        if self.cache_max_age <= 0 or not os.path.isdir(self.cache_dir):
+            return
+        cutoff = time.time() - self.cache_max_age
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    # Another worker may have removed or replaced it
+                    pass
+
+    def _maybe_prune_cache(self):
+        # At most once a day per process, so uploads don't walk the cache each time
+        now = time.time()
+        if now - self._last_prune >= 86400:
+            self._last_prune = now
+            self.prune_cache()
+
+    def ocr_pages(self, file_path: str, page_indices: Iterable[int]) -> Dict[int, str]:
+        """
+        OCR the given pages of a PDF concurrently.
+        Returns a dictionary mapping page index to recognized text.
+        Cached pages are returned without touching the worker pool.
+        """
+        results = {}
+        if not self.available:
+            return results
+
+        import PyPDF2
+
+        self._maybe_prune_cache()
+
+        reader = PyPDF2.PdfReader(file_path)
+        # future -> (page index, cache key, page PDF, pool, attempt)
+        in_flight = {}
+
+        def submit(index, key, page_pdf, attempt):
+            executor = _get_executor(self.max_workers)
+            try:
+                future = executor.submit(_render_and_ocr, page_pdf, self.dpi, self.lang, self.timeout)
+            except BrokenProcessPool:
+                _discard_executor(executor)
+                executor = _get_executor(self.max_workers)
+                future = executor.submit(_render_and_ocr, page_pdf, self.dpi, self.lang, self.timeout)
+            in_flight[future] = (index, key, page_pdf, executor, attempt)
+
+        def collect(done):
+            for future in done:
+                index, key, page_pdf, executor, attempt = in_flight.pop(future)
+                try:
+                    text = future.result()
+                except BrokenProcessPool as e:
+                    _discard_executor(executor)
+                    # Retry once on a fresh pool; a page that kills its worker twice is skipped
+                    if attempt == 0:
+                        submit(index, key, page_pdf, attempt + 1)
+                    else:
+                        print(f"Error running OCR on page {index + 1}: {e}")
+                    continue
+                except Exception as e:
+                    print(f"Error running OCR on page {index + 1}: {e}")
+                    continue
+                results[index] = text
+                self._write_cache(key, text)
+
+        try:
+            for index in page_indices:
+                page_pdf = self._page_bytes(reader, index)
+                key = self._cache_key(page_pdf)
+
+                cached = self._read_cache(key)
+                if cached is not None:
+                    results[index] = cached
+                    continue
+
+                # Bound the number of pages this upload holds in memory at once
+                while len(in_flight) >= self.max_workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                submit(index, key, page_pdf, 0)
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        except Exception as e:
+            # Keep the pages already recognized or cached rather than failing the whole PDF
+            print(f"Error running OCR: {e}")
+
+        return results
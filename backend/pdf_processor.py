@@ -1,39 +1,59 @@
-import pdfplumber
-import PyPDF2
-from typing import Optional
+from typing import List, Optional
 import os
 
+from ocr import OCRProcessor
+
 class PDFProcessor:
     """Handles PDF to text conversion"""
-    
+
+    def __init__(self, ocr: Optional[OCRProcessor] = None):
+        self.ocr = ocr or OCRProcessor()
+
     def pdf_to_text(self, file_path: str) -> str:
         """
-        Convert PDF to text using multiple methods for better accuracy
+        Convert PDF to text using multiple methods for better accuracy.
+        Pages without a text layer (scanned/handwritten) are OCR'd.
         """
-        text = ""
-        
+        # Imported lazily so importing the API doesn't load the PDF stack
+        import pdfplumber
+        import PyPDF2
+
+        page_texts: List[str] = []
+
         # Try pdfplumber first (better for text extraction)
         try:
             with pdfplumber.open(file_path) as pdf:
                 for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                    page_texts.append(page.extract_text() or "")
         except Exception as e:
             print(f"Error with pdfplumber: {e}")
-        
-        # Fallback to PyPDF2 if pdfplumber fails or text is empty
-        if not text.strip():
+            page_texts = []
+
+        # Fallback to PyPDF2 for pages pdfplumber could not read
+        if not page_texts or not all(t.strip() for t in page_texts):
             try:
                 with open(file_path, 'rb') as file:
                     pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
+                    if not page_texts:
+                        page_texts = [""] * len(pdf_reader.pages)
+                    for i, page in enumerate(pdf_reader.pages):
+                        if not page_texts[i].strip():
+                            page_texts[i] = page.extract_text() or ""
             except Exception as e:
                 print(f"Error with PyPDF2: {e}")
-        
+
+        # OCR only the pages that have no text layer
+        missing = [i for i, t in enumerate(page_texts) if not t.strip()]
+        if missing:
+            try:
+                for i, ocr_text in self.ocr.ocr_pages(file_path, missing).items():
+                    page_texts[i] = ocr_text
+            except Exception as e:
+                print(f"Error with OCR: {e}")
+
+        text = "\n".join(t.strip() for t in page_texts if t.strip())
+
         if not text.strip():
             raise ValueError("Could not extract text from PDF")
-        
-        return text.strip()
 
+        return text.strip()
@@ -30,5 +30,21 @@ class TopicAverage(BaseModel):
     average_score: float
 
 class AnalyticsResponse(BaseModel):
+    course_id: Optional[int] = None
     topic_averages: List[TopicAverage]
 
+
+class CourseCreate(BaseModel):
+    name: str
+
+class CourseResponse(BaseModel):
+    id: int
+    name: str
+    created_at: str
+
+class EnrollmentCreate(BaseModel):
+    usernames: List[str]
+
+class EnrollmentResponse(BaseModel):
+    course_id: int
+    usernames: List[str]
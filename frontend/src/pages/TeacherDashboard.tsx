@@ -18,6 +18,10 @@ function TeacherDashboard() {
   const [analytics, setAnalytics] = useState<TopicAverage[]>([])
   const [uploading, setUploading] = useState(false)
   const [uploadMessage, setUploadMessage] = useState('')
+  const [courseId, setCourseId] = useState<number | null>(null)
+  const [enrollUsernames, setEnrollUsernames] = useState('')
+  const [enrolling, setEnrolling] = useState(false)
+  const [enrollMessage, setEnrollMessage] = useState('')
 
   useEffect(() => {
     fetchCurrentCode()
@@ -53,6 +57,7 @@ function TeacherDashboard() {
     try {
       const response = await axios.get('/api/teacher/analytics')
       setAnalytics(response.data.topic_averages)
+      setCourseId(response.data.course_id)
     } catch (error) {
       console.error('Error fetching analytics:', error)
     }
@@ -84,6 +89,30 @@ function TeacherDashboard() {
     }
   }
 
+  const handleEnroll = async (e: React.FormEvent) => {
+    e.preventDefault()
+    if (courseId === null) return
+
+    const usernames = enrollUsernames
+      .split(',')
+      .map((name) => name.trim())
+      .filter((name) => name)
+    if (usernames.length === 0) return
+
+    setEnrolling(true)
+    setEnrollMessage('')
+
+    try {
+      const response = await axios.post(`/api/teacher/courses/${courseId}/enrollments`, { usernames })
+      setEnrollMessage(`Enrolled ${response.data.usernames.join(', ')} in your class.`)
+      setEnrollUsernames('')
+    } catch (error: any) {
+      setEnrollMessage(`Error: ${error.response?.data?.detail || 'Enrollment failed'}`)
+    } finally {
+      setEnrolling(false)
+    }
+  }
+
   const formatExpiry = (expiresAt: string | null) => {
     if (!expiresAt) return ''
     const date = new Date(expiresAt)
@@ -144,6 +173,32 @@ function TeacherDashboard() {
           </div>
         </div>
 
+        <div className="dashboard-section">
+          <h2>Enroll Students</h2>
+          {courseId === null ? (
+            <p className="no-data">Upload a syllabus first to create your class.</p>
+          ) : (
+            <form onSubmit={handleEnroll} className="enroll-section">
+              <input
+                type="text"
+                value={enrollUsernames}
+                onChange={(e) => setEnrollUsernames(e.target.value)}
+                placeholder="Student usernames, comma separated"
+                disabled={enrolling}
+                className="enroll-input"
+              />
+              <button type="submit" disabled={enrolling} className="generate-btn">
+                {enrolling ? 'Enrolling...' : 'Enroll'}
+              </button>
+            </form>
+          )}
+          {enrollMessage && (
+            <div className={`upload-message ${enrollMessage.includes('Error') ? 'error' : 'success'}`}>
+              {enrollMessage}
+            </div>
+          )}
+        </div>
+
         <div className="dashboard-section">
           <h2>Class Performance Analytics</h2>
           <p className="section-description">